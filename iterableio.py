@@ -1,56 +1,298 @@
 #!/usr/bin/env python
 
+import collections
+import functools
 import io
 
+# io.DEFAULT_BUFFER_SIZE is tuned for disk I/O block sizes. For an in-process
+# iterable the dominant cost is Python-level call overhead per read, which a
+# larger buffer amortizes much better.
+_DEFAULT_BUFFER_SIZE = max(io.DEFAULT_BUFFER_SIZE, 64 * 1024)
+
 
 class RawIterableReader(io.RawIOBase):
     """A io.RawIOBase implemention for an iterable of bytes
 
     In most cases, this class should not be used directly. See the included
     `open_iterable` function for a high-level interface.
+
+    The iterable can also yield other bytes-like objects (`bytearray`,
+    `memoryview`, etc) - anything that isn't `bytes` or `bytearray` is
+    converted to contiguous `bytes` as it's pulled.
+
+    Alternatively, pass `zero_copy=True` to use byte-sized views of the
+    yielded chunks instead of converting them. This skips a full copy of the
+    data when the producer already holds it in a large backing buffer (e.g.
+    an `mmap`), but requires that the chunks are C-contiguous and that the
+    producer doesn't mutate them before they're read. Combined with `read1`,
+    chunks are handed through to the consumer without any copying at all.
     """
 
-    def __init__(self, iterable):
-        self._iter = iter(iterable)
-        self._extra = bytearray()
+    def __init__(self, iterable, zero_copy=False):
+        # Buffered chunks are stored as-yielded instead of being copied into a
+        # single growing buffer. `_head` is the read offset into the first
+        # chunk and `_buffered` is the total number of unread buffered bytes.
+        # `_chunks` also doubles as the closed flag (None once closed) so set
+        # it first in case anything below raises.
+        self._chunks = collections.deque()
+        # filter(None, ...) discards empty chunks at the C level so they
+        # never have to be skipped over in the read loops (yielding empty
+        # bytes does not signal EOF, only StopIteration does)
+        self._iter = filter(None, iterable)
+        self._zero_copy = zero_copy
+        self._head = 0
+        # Cached memoryview over self._chunks[0] (or None, built lazily).
+        # Re-wrapping the same chunk in a memoryview on every call adds up
+        # when a large chunk is consumed by many small reads.
+        self._head_mv = None
+        self._buffered = 0
         self._total = 0
 
     def readable(self):
         return True
 
+    @property
+    def closed(self):
+        return self._chunks is None
+
     def close(self):
         self._iter = None
-        self._extra = None
+        self._chunks = None
+        self._head_mv = None
         super().close()
 
     def tell(self):
         """The total number of bytes that have been read"""
-        self._checkClosed()
-        return self._total - len(self._extra)
+        if self._chunks is None:
+            raise ValueError("I/O operation on closed file")
+        return self._total - self._buffered
+
+    def read1(self, size=-1):
+        """Read and return up to size bytes using at most one chunk
+
+        Serves from the first buffered chunk if there is one, otherwise
+        pulls a single chunk from the iterable. A chunk that fits within
+        size is returned as-yielded without being copied. Returns b"" at
+        EOF (or if size is 0).
+        """
+        if self._chunks is None:
+            raise ValueError("I/O operation on closed file")
+        if size == 0:
+            return b""
+
+        if self._chunks:
+            chunk = self._chunks[0]
+            head = self._head
+            head_mv = self._head_mv
+            if head_mv is None:
+                head_mv = self._head_mv = memoryview(chunk)
+            avail = len(chunk) - head
+            if 0 <= size < avail:
+                self._head += size
+                self._buffered -= size
+                return bytes(head_mv[head:head + size])
+            self._chunks.popleft()
+            self._head = 0
+            self._head_mv = None
+            self._buffered -= avail
+            return bytes(head_mv[head:]) if head else chunk
+
+        if self._iter is None:
+            return b""
+        try:
+            new = next(self._iter)
+        except StopIteration:
+            self._iter = None
+            return b""
+        if type(new) is not bytes and type(new) is not bytearray:
+            # same normalization as readinto - len() and slicing are only
+            # byte-accurate once the chunk is a contiguous byte view
+            if self._zero_copy:
+                new = memoryview(new).cast("B")
+            else:
+                new = bytes(memoryview(new))
+        lnew = len(new)
+        self._total += lnew
+        if size < 0 or lnew <= size:
+            # the common case: hand the yielded chunk straight through
+            return new
+        # keep the part that doesn't fit for the next read
+        nmv = memoryview(new)
+        self._chunks.append(new)
+        self._head = size
+        self._head_mv = nmv
+        self._buffered += lnew - size
+        return bytes(nmv[:size])
+
+    def readall(self):
+        """Read and return all bytes until the iterable is exhausted
+
+        Collects the remaining chunks and joins them once, instead of the
+        default implementation's repeated fixed-size readinto calls into an
+        incrementally-grown buffer.
+        """
+        if self._chunks is None:
+            raise ValueError("I/O operation on closed file")
+        parts = []
+        if self._chunks:
+            if self._head:
+                # skip the already-read prefix of the first chunk without
+                # copying it
+                head_mv = self._head_mv
+                if head_mv is None:
+                    head_mv = memoryview(self._chunks[0])
+                self._chunks.popleft()
+                parts.append(head_mv[self._head:])
+                self._head = 0
+            parts.extend(self._chunks)
+            self._chunks.clear()
+            self._head_mv = None
+            self._buffered = 0
+        if self._iter is not None:
+            total = self._total
+            for new in self._iter:
+                if type(new) is not bytes and type(new) is not bytearray:
+                    if self._zero_copy:
+                        new = memoryview(new).cast("B")
+                    else:
+                        new = bytes(memoryview(new))
+                total += len(new)
+                parts.append(new)
+            self._total = total
+            self._iter = None
+        return b"".join(parts)
 
     def readinto(self, b):
         """Read bytes into a pre-allocated bytes-like object b
 
         Returns the number of bytes read, 0 indicates EOF
         """
-        self._checkClosed()
+        # Inlined closed check (here and in the other read methods):
+        # _checkClosed costs several attribute lookups and a property call,
+        # this is a single comparison
+        if self._chunks is None:
+            raise ValueError("I/O operation on closed file")
         num = len(b)
-        if self._iter is not None:
-            while len(self._extra) < num:
-                try:
-                    new = next(self._iter)
-                except StopIteration:
-                    self._iter = None
-                    break
-                else:
-                    self._total += len(new)
-                    self._extra += new
+        if not num:
+            # zero-length probe (e.g. read(0)) - don't build a memoryview or
+            # pull from the iterator
+            return 0
+        mv = memoryview(b)
+
+        # The loops below alias attributes as locals - a local lookup is
+        # much cheaper than the dict lookup an attribute access costs.
+
+        # Drain any previously-buffered chunks first
+        chunks = self._chunks
+        head = self._head
+        head_mv = self._head_mv
+        off = 0
+        while off < num and chunks:
+            chunk = chunks[0]
+            if head_mv is None:
+                head_mv = memoryview(chunk)
+            take = min(num - off, len(chunk) - head)
+            # memoryview source and destination so the copy is a straight
+            # memcpy instead of materializing an intermediate bytes slice
+            mv[off:off + take] = head_mv[head:head + take]
+            off += take
+            head += take
+            if head == len(chunk):
+                chunks.popleft()
+                head = 0
+                head_mv = None
+        self._head = head
+        self._head_mv = head_mv
+        self._buffered -= off
+
+        it = self._iter
+        if it is not None:
+            nxt = it.__next__
+            chunks_append = chunks.append
+            total = self._total
+            buffered = self._buffered
+            try:
+                # Copy new chunks directly into the caller's buffer, only
+                # spilling the excess of a chunk that overflows it into the
+                # chunk buffer. This avoids staging data through the buffer
+                # just to immediately copy it back out.
+                while off < num:
+                    new = nxt()
+                    if type(new) is not bytes and type(new) is not bytearray:
+                        # force a contiguous buffer (or a byte-sized view of
+                        # one in zero-copy mode); the exact-type check is
+                        # cheaper than generic buffer dispatch for the
+                        # common bytes case. Going through memoryview also
+                        # ensures non-buffer objects raise TypeError instead
+                        # of being misinterpreted (e.g. bytes(int) would
+                        # produce NUL padding)
+                        if self._zero_copy:
+                            new = memoryview(new).cast("B")
+                        else:
+                            new = bytes(memoryview(new))
+                    lnew = len(new)
+                    total += lnew
+                    if off + lnew <= num:
+                        mv[off:off + lnew] = new
+                        off += lnew
+                    else:
+                        take = num - off
+                        nmv = memoryview(new)
+                        mv[off:num] = nmv[:take]
+                        chunks_append(new)
+                        self._head = take
+                        # the spilled chunk is now the head of the (empty
+                        # before this) deque; keep its view for next time
+                        self._head_mv = nmv
+                        buffered += lnew - take
+                        off = num
+            except StopIteration:
+                self._iter = None
+            self._total = total
+            self._buffered = buffered
+
+        return off
+
+
+@functools.lru_cache(maxsize=32)
+def _validate_args(mode, buffering, encoding, errors, newline):
+    """Validate open_iterable arguments, returning (binary, buffering)
+
+    In practice the same handful of argument combinations are used for the
+    lifetime of a process, so the results are cached to take validation off
+    the open path entirely. Invalid combinations raise (and aren't cached).
+    """
+    # Validate the mode in a single pass instead of building throwaway sets
+    reading = binary = text = False
+    for c in mode:
+        if c == "r" and not reading:
+            reading = True
+        elif c == "b" and not binary:
+            binary = True
+        elif c == "t" and not text:
+            text = True
+        else:
+            # unknown or duplicated character
+            raise ValueError("invalid mode: '{}'".format(mode))
+    text = text or (reading and not binary)
 
-        ret, self._extra = self._extra[:num], self._extra[num:]
+    if not reading:
+        raise ValueError("Must specify read mode")
+    if text and binary:
+        raise ValueError("can't have text and binary mode at once")
+    if binary and encoding is not None:
+        raise ValueError("binary mode doesn't take an encoding argument")
+    if binary and errors is not None:
+        raise ValueError("binary mode doesn't take an errors argument")
+    if binary and newline is not None:
+        raise ValueError("binary mode doesn't take a newline argument")
+    if text and buffering == 0:
+        raise ValueError("can't have unbuffered text I/O")
 
-        lret = len(ret)
-        b[:lret] = ret
-        return lret
+    if buffering < 0:
+        buffering = _DEFAULT_BUFFER_SIZE
+
+    return binary, buffering
 
 
 def open_iterable(iterable, mode="r", buffering=-1, encoding=None, errors=None, newline=None):
@@ -81,8 +323,10 @@ def open_iterable(iterable, mode="r", buffering=-1, encoding=None, errors=None,
     buffering is an optional integer used to set the buffering policy. Pass 0
     to switch buffering off (only allowed in binary mode), and an integer > 0
     to indicate the size of a fixed-size chunk buffer. When no buffering
-    argument is given, `io.DEFAULT_BUFFER_SIZE` will be used. On many systems,
-    the buffer will typically be 4096 or 8192 bytes long.
+    argument is given, a default of at least 64 KiB will be used. Unlike real
+    file I/O there is no disk block size to match, so a buffer larger than
+    `io.DEFAULT_BUFFER_SIZE` is used to reduce the number of Python-level
+    read calls.
 
     encoding is the str name of the encoding used to decode or encode the
     file. This should only be used in text mode. The default encoding is
@@ -124,26 +368,7 @@ def open_iterable(iterable, mode="r", buffering=-1, encoding=None, errors=None,
     """
     # This function is modeled after `io.open`, found in `Lib/_pyio.py`
 
-    modes = set(mode)
-    if modes - set("rtb") or len(mode) > len(modes):
-        raise ValueError("invalid mode: '{}'".format(mode))
-
-    reading = "r" in modes
-    binary = "b" in modes
-    text = "t" in modes or (reading and not binary)
-
-    if not reading:
-        raise ValueError("Must specify read mode")
-    if text and binary:
-        raise ValueError("can't have text and binary mode at once")
-    if binary and encoding is not None:
-        raise ValueError("binary mode doesn't take an encoding argument")
-    if binary and errors is not None:
-        raise ValueError("binary mode doesn't take an errors argument")
-    if binary and newline is not None:
-        raise ValueError("binary mode doesn't take a newline argument")
-    if text and buffering == 0:
-        raise ValueError("can't have unbuffered text I/O")
+    binary, buffering = _validate_args(mode, buffering, encoding, errors, newline)
 
     ret = RawIterableReader(iterable)
     try:
@@ -151,9 +376,6 @@ def open_iterable(iterable, mode="r", buffering=-1, encoding=None, errors=None,
             # unbuffered binary mode
             return ret
 
-        if buffering < 0:
-            buffering = io.DEFAULT_BUFFER_SIZE
-
         ret = io.BufferedReader(ret, buffering)
 
         if binary:
@@ -163,6 +385,9 @@ def open_iterable(iterable, mode="r", buffering=-1, encoding=None, errors=None,
         # buffered text mode
         ret = io.TextIOWrapper(ret, encoding, errors, newline)
         ret.mode = mode
+        # Have the decoder pull bigger chunks per call as well (undocumented
+        # but stable attribute, see Lib/_pyio.py)
+        ret._CHUNK_SIZE = _DEFAULT_BUFFER_SIZE
         return ret
     except:
         ret.close()
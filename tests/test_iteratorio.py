@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 
 import io
+from array import array
 
 from iterableio import RawIterableReader, open_iterable
 
@@ -101,6 +102,85 @@ def test_unreadable_after_close(mode, buffering):
         i.tell()
 
 
+def test_readall():
+    """Test reading everything at once, including mid-chunk"""
+    chunks = [b"12345", b"abcde", b"fghij"]
+
+    i = RawIterableReader(chunks)
+    assert i.readall() == b"12345abcdefghij"
+    assert i.readall() == b""
+    assert i.tell() == 15
+
+    # readall after a partial read picks up mid-chunk
+    i = RawIterableReader(chunks)
+    assert i.read(3) == b"123"
+    assert i.readall() == b"45abcdefghij"
+    assert i.tell() == 15
+
+
+def test_read1():
+    """Test that read1 returns at most one chunk at a time"""
+    chunks = [b"12345", b"abcde"]
+
+    i = RawIterableReader(chunks)
+    assert i.read1() == b"12345"  # no size = one full chunk, not everything
+    assert i.read1(100) == b"abcde"  # never more than one chunk
+    assert i.read1() == b""
+    assert i.tell() == 10
+
+    # a chunk bigger than the requested size is split across reads
+    i = RawIterableReader(chunks)
+    assert i.read1(3) == b"123"
+    assert i.read1(3) == b"45"  # rest of the first chunk only
+    assert i.read1(0) == b""
+    assert i.read1() == b"abcde"
+    assert i.tell() == 10
+
+
+def test_read1_normalizes_chunks():
+    """Test that read1 sizes/slices non-bytes chunks in bytes, not elements"""
+    a = array("I", range(8))
+    raw = a.tobytes()
+
+    for zero_copy in (False, True):
+        i = RawIterableReader([memoryview(a)], zero_copy=zero_copy)
+        assert i.read1(2) == raw[:2]  # 2 bytes, not 2 array elements
+        assert i.tell() == 2
+        assert i.read(4) == raw[2:6]  # the spilled tail drains correctly
+        assert i.read1() == raw[6:]
+        assert i.tell() == len(raw)
+
+
+def test_invalid_chunk_type():
+    """Test that non-bytes-like chunks raise instead of corrupting the stream"""
+    # bytes(5) would be 5 NUL bytes - make sure that can't happen
+    i = RawIterableReader([b"ok", 5, b"end"])
+    assert i.read(2) == b"ok"
+    with pytest.raises(TypeError):
+        i.read()
+
+    # passing a bytes object instead of an iterable of bytes iterates it as
+    # ints - it should raise, not produce NUL padding
+    with open_iterable(b"12345", "rb") as i:
+        with pytest.raises(TypeError):
+            i.read()
+
+
+def test_zero_copy():
+    """Test reading from an iterable that yields views of a backing buffer"""
+    backing = bytes(range(20))
+
+    def gen():
+        for x in range(0, 20, 5):
+            yield memoryview(backing)[x:x + 5]
+
+    for zero_copy in (False, True):
+        i = RawIterableReader(gen(), zero_copy=zero_copy)
+        assert i.read(3) == backing[:3]
+        assert i.read() == backing[3:]
+        assert i.tell() == 20
+
+
 def test_yield_empty_bytes():
     """Test that a generator is only 'done' when it stops yielding, not when it yields empty bytes"""
     def gen():